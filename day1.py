@@ -1,24 +1,62 @@
+from time import perf_counter
+
+import numpy as np
+
+DIGITS = frozenset('0123456789')
+
+
 def parse_document(lines: list[str]) -> int:
     return sum(parse_line(line) for line in lines if line != '')
 
 
 def parse_line(line: str) -> int:
-    digits = [c for c in line if c in {str(i) for i in range(10)}]
-    if len(digits) == 0:
+    first = next((c for c in line if c in DIGITS), None)
+    if first is None:
         return 0
-    return int(digits[0] + digits[-1])
+    last = next(c for c in reversed(line) if c in DIGITS)
+    return int(first + last)
+
+
+def parse_bytes(document: bytes) -> int:
+    characters = np.frombuffer(document, dtype=np.uint8)
+    kept = (characters - np.uint8(ord('0')) < 10) | (characters == ord('\n'))
+    tokens = np.concatenate(([ord('\n')], characters[kept], [ord('\n')]))
+    newline = tokens == ord('\n')
+    # A digit right after a newline opens a line's digits; one right before closes them.
+    first_digits = tokens[1:][newline[:-1] & ~newline[1:]]
+    last_digits = tokens[:-1][~newline[:-1] & newline[1:]]
+    return int(10 * first_digits.sum(dtype=np.int64) + last_digits.sum(dtype=np.int64)
+               - 11 * ord('0') * len(first_digits))
 
 
 
 assert parse_line('12') == 12
 assert parse_line('1a3') == 13
 assert parse_line('b3a8') == 38
+assert parse_line('a7b') == 77
+assert parse_line('abc') == 0
 assert parse_document(['b2c9', '1234']) == 29 + 14
 assert parse_document(['b2c9', '', '1234']) == 29 + 14
 assert parse_document(['b2c9', '\n', '1234']) == 29 + 14
+assert parse_bytes(b'b2c9\n1234') == 29 + 14
+assert parse_bytes(b'b2c9\n\nabc\n1234\n') == 29 + 14
+assert parse_bytes(b'a7b\r\n') == 77
+assert parse_bytes(b'') == 0
+assert parse_bytes(b'\n\n') == 0
+assert parse_bytes(b'abc\n5') == 55
 
 
 with open('day1_input', 'r') as f:
     lines = [line for line in f]
 
 print(parse_document(lines))
+
+with open('day1_input', 'rb') as binary_file:
+    document = binary_file.read()
+
+assert parse_bytes(document) == parse_document(lines)
+
+if __name__ == '__main__':
+    start = perf_counter()
+    parse_bytes(1000 * document)
+    print(perf_counter() - start)
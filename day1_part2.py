@@ -1,8 +1,12 @@
+from __future__ import annotations
+
+from collections import deque
+from itertools import chain, repeat
+from time import perf_counter
 from uuid import uuid4
 from dataclasses import dataclass
-from enum import Enum, auto
-from typing import Union, Iterator, Generic, Protocol, TypeVar
-import string
+from enum import Enum
+from typing import Iterable, Iterator
 
 
 class Digit(Enum):
@@ -17,118 +21,79 @@ class Digit(Enum):
     NINE = 9
 
 
-def parse_document(lines: list[str]) -> int:
-    return sum(
-        int(str(parsed_line[0].value) + str(parsed_line[-1].value))
-        for parsed_line in map(parse_line, lines)
-        if len(parsed_line) > 0
-    )
-
-
-def parse_line(line: str) -> list[Digit]:
-    tokens = many(
-            or_(
-                parse_digit, 
-                skip(string.ascii_lowercase)))(line).result
-    return [token for token in tokens if token != Skipped()]
-
-
-T = TypeVar('T')
-
-
 @dataclass(frozen=True)
-class CouldNotParse:
-    pass
-
-
-@dataclass(frozen=True)
-class ParseResult(Generic[T]):
-    result: T | CouldNotParse
-    remainder: str
-
-
-class Parser(Protocol[T]):
-    def __call__(self, to_parse: str) -> ParseResult[T]:
-        pass
-
-
-def make_digit_parser(
-    digit: str,
-    result: Digit,
-) -> Parser[Digit]:
-    def parser(to_parse: str) -> ParseResult[Digit]:
-        if to_parse.startswith(digit):
-            return ParseResult(remainder=to_parse[1:], result=result)
-        if to_parse.startswith(result.name.lower()):
-            return ParseResult(remainder=to_parse[len(result.name):], result=result)
-        return ParseResult(remainder=to_parse, result=CouldNotParse())
-    return parser
-
-
-def or_(*parsers: Parser[T]) -> Parser[T]:
-    def parser(to_parse: str) -> ParseResult[T]:
-        for parser in parsers:
-            attempt = parser(to_parse)
-            if attempt.result == CouldNotParse():
-                continue
-            return attempt
-        return ParseResult(CouldNotParse(), to_parse)
-    return parser
-
-
-parse_digit: Parser[Digit] = or_(
-    *(
-        make_digit_parser(str(digit), result)
-        for digit, result in enumerate(Digit, 1)
-    )
-)
-
-
-def many(parser: Parser[T]) -> Parser[list[T]]:
-    def parser_(to_parse: str) -> ParseResult[T]:
-        result = parser(to_parse)
-        if result.result == CouldNotParse():
-            return ParseResult(result=[], remainder=to_parse)
-        remaining_results = parser_(result.remainder)
-        return ParseResult(
-            result=[result.result] + remaining_results.result,
-            remainder=remaining_results.remainder,
-        )
-
-    return parser_
-
+class DigitAutomaton:
+    transitions: list[dict[str, int]]
+    matches: list[tuple[Digit, ...]]
+
+    @classmethod
+    def from_words(cls, words: dict[str, Digit]) -> DigitAutomaton:
+        goto: list[dict[str, int]] = [{}]
+        matches: list[tuple[Digit, ...]] = [()]
+        for word, digit in words.items():
+            state = 0
+            for c in word:
+                if c not in goto[state]:
+                    goto[state][c] = len(goto)
+                    goto.append({})
+                    matches.append(())
+                state = goto[state][c]
+            matches[state] = (digit,)
+
+        transitions: list[dict[str, int]] = [{} for _ in goto]
+        transitions[0] = dict(goto[0])
+        fail = [0 for _ in goto]
+        queue = deque(goto[0].values())
+        while len(queue) > 0:
+            state = queue.popleft()
+            transitions[state] = {**transitions[fail[state]], **goto[state]}
+            matches[state] = matches[state] + matches[fail[state]]
+            for c, child in goto[state].items():
+                fail[child] = transitions[fail[state]].get(c, 0)
+                queue.append(child)
+
+        return DigitAutomaton(transitions, matches)
+
+    def scan(self, text: Iterable[str]) -> Iterator[Digit]:
+        transitions = self.transitions
+        matches = self.matches
+        state = 0
+        for c in text:
+            state = transitions[state].get(c, 0)
+            yield from matches[state]
+
+
+digit_words = {
+    **{str(digit.value): digit for digit in Digit},
+    **{digit.name.lower(): digit for digit in Digit},
+}
+forward_automaton = DigitAutomaton.from_words(digit_words)
+backward_automaton = DigitAutomaton.from_words({
+    word[::-1]: digit
+    for word, digit in digit_words.items()
+})
 
-@dataclass(frozen=True)
-class Skipped:
-    pass
 
+def parse_document(lines: Iterable[str]) -> int:
+    return sum(map(parse_calibration_value, lines))
 
-def skip(characters: str) -> Parser[Skipped]:
-    def parser(to_parse: str) -> ParseResult[Skipped]:
-        if any(to_parse.startswith(c) for c in characters):
-            return ParseResult(result=Skipped(), remainder=to_parse[1:])
-        return ParseResult(result=CouldNotParse(), remainder=to_parse)
-    return parser
 
+def parse_file(path: str) -> int:
+    with open(path, 'r') as f:
+        return parse_document(f)
 
-parse_one = make_digit_parser('1', Digit.ONE)
-parse_two = make_digit_parser('2', Digit.TWO)
 
-assert parse_one('1').result == Digit.ONE
-assert parse_one('one').result == Digit.ONE
-assert parse_one('two').result == CouldNotParse()
-assert parse_one('1a').remainder == 'a'
-assert parse_one('onea').remainder == 'a'
+def parse_calibration_value(line: str) -> int:
+    first = next(forward_automaton.scan(line), None)
+    if first is None:
+        return 0
+    last = next(backward_automaton.scan(reversed(line)))
+    return 10 * first.value + last.value
 
-assert parse_digit('two').result == Digit.TWO
-assert parse_digit('one').result == Digit.ONE
-assert parse_digit('six').result == Digit.SIX
 
-assert many(parse_digit)('sixsix6').result == 3 * [Digit.SIX]
-assert many(parse_digit)('').result == []
+def parse_line(line: str) -> list[Digit]:
+    return list(forward_automaton.scan(line))
 
-assert skip('b')('b').remainder == ''
-assert skip('b')('bcd').remainder == 'cd'
 
 assert parse_line('12') == [Digit.ONE, Digit.TWO]
 assert parse_line('1a3') == [Digit.ONE, Digit.THREE], parse_line('1a3')
@@ -144,10 +109,21 @@ assert parse_document(['a2', '1']) == 33
 assert parse_document(['aaa', '1']) == 11
 assert parse_document(['a3a2aaaaaa2', 'as2a1a1\n', '\n']) == 53
 assert parse_document(['sevennine']) == 79
-assert parse_document(['sevenine']) in {77, 99}
-assert parse_document(['1nineight']) in {19, 18}
+assert parse_document(['sevenine']) == 79
+assert parse_document(['1nineight']) == 18
 assert parse_document(['sevenineight']) == 78
 
+assert parse_line('oneight') == [Digit.ONE, Digit.EIGHT]
+assert parse_line('twone3') == [Digit.TWO, Digit.ONE, Digit.THREE]
+assert parse_line('sevenine') == [Digit.SEVEN, Digit.NINE]
+assert parse_line('nineighthree') == [Digit.NINE, Digit.EIGHT, Digit.THREE]
+assert parse_line('ninine') == [Digit.NINE]
+assert parse_line('fo0ur') == []
+assert parse_calibration_value('xtwone') == 21
+assert parse_calibration_value('oneight') == 18
+assert parse_calibration_value('eighthree7sevenine') == 89
+assert parse_calibration_value('abc') == 0
+
 
 d = {
     'vvcfdjlpcrfnnmbcx4eight9mtcfqqqfl5fourfive': 45,
@@ -212,13 +188,16 @@ assert parse_document(list(d.keys())) == sum(d.values())
 
 with open('day1_input', 'r') as f:
     lines = [
-        line
-        .rstrip()
-        .replace('one', 'oonee')
-        .replace('two', 'ttwoo')
+        line.rstrip()
         for line in f
     ]
 
 
 assert parse_document(lines) == 55343, parse_document(lines)
+assert parse_file('day1_input') == 55343
+
+if __name__ == '__main__':
+    start = perf_counter()
+    parse_document(chain.from_iterable(repeat(lines, 1000)))
+    print(perf_counter() - start)
 
@@ -1,8 +1,15 @@
 from __future__ import annotations
+from bisect import bisect_right
+from itertools import product
+from time import perf_counter
 from uuid import uuid4
 from dataclasses import dataclass
-from typing import Union, Iterator, Generic, Protocol, TypeVar
+from functools import cached_property
+from typing import Union, Iterable, Iterator, Generic, Protocol, TypeVar
 import string
+
+import numpy as np
+
 from parsing import *
 
 
@@ -104,14 +111,151 @@ Game 5: 6 red, 1 blue, 3 green; 2 blue, 1 red, 2 green
 """
 
 
-def collect_possible_games(unparsed_games: list[str], bag: BagContent) -> int:
-    games = [game(unparsed_game).result for unparsed_game in unparsed_games]
-    return sum(game.id_ for game in games if game.is_possible_with(bag))
+@dataclass(frozen=True)
+class GameColumns:
+    ids: np.ndarray
+    offsets: np.ndarray
+    red: np.ndarray
+    green: np.ndarray
+    blue: np.ndarray
+
+    @classmethod
+    def from_lines(cls, unparsed_games: Iterable[str]) -> GameColumns:
+        ids: list[int] = []
+        offsets = [0]
+        columns: dict[str, list[int]] = {'red': [], 'green': [], 'blue': []}
+        for unparsed_game in unparsed_games:
+            unparsed_game = unparsed_game.strip()
+            if unparsed_game == '':
+                continue
+            header, reveals = unparsed_game.split(': ')
+            ids.append(int(header[len('Game '):]))
+            for reveal in reveals.split('; '):
+                counts = dict.fromkeys(columns, 0)
+                for cubes in reveal.split(', '):
+                    number, color_ = cubes.split(' ')
+                    counts[color_] += int(number)
+                for color_, column in columns.items():
+                    column.append(counts[color_])
+            offsets.append(len(columns['red']))
+        return GameColumns(
+            ids=np.array(ids, dtype=np.int64),
+            offsets=np.array(offsets, dtype=np.int64),
+            red=np.array(columns['red'], dtype=np.int64),
+            green=np.array(columns['green'], dtype=np.int64),
+            blue=np.array(columns['blue'], dtype=np.int64),
+        )
+
+    def _grouped_max(self, column: np.ndarray) -> np.ndarray:
+        # reduceat cannot express an empty group, so only non-empty groups are reduced
+        # and games without reveals keep a maximum of zero.
+        maxima = np.zeros(len(self.ids), dtype=np.int64)
+        non_empty = self.reveal_counts > 0
+        maxima[non_empty] = np.maximum.reduceat(column, self.offsets[:-1][non_empty])
+        return maxima
+
+    @cached_property
+    def lower_bounds(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return (
+            self._grouped_max(self.red),
+            self._grouped_max(self.green),
+            self._grouped_max(self.blue),
+        )
+
+    @cached_property
+    def reveal_counts(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def sum_possible_ids(self, bag: BagContent) -> int:
+        reds, greens, blues = self.lower_bounds
+        possible = (self.reveal_counts > 0) & (reds <= bag.red) & (greens <= bag.green) & (blues <= bag.blue)
+        return int(self.ids[possible].sum())
+
+    def sum_powers(self) -> int:
+        reds, greens, blues = self.lower_bounds
+        return int((reds * greens * blues).sum())
+
+
+def fenwick_add(tree: list[list[int]], row: int, column: int, value: int) -> None:
+    while row < len(tree):
+        cells = tree[row]
+        ix = column
+        while ix < len(cells):
+            cells[ix] += value
+            ix += ix & -ix
+        row += row & -row
+
+
+def fenwick_prefix_sum(tree: list[list[int]], row: int, column: int) -> int:
+    total = 0
+    while row > 0:
+        cells = tree[row]
+        ix = column
+        while ix > 0:
+            total += cells[ix]
+            ix -= ix & -ix
+        row -= row & -row
+    return total
+
+
+@dataclass(frozen=True)
+class GameIndex:
+    # Bags are answered offline: sweep them by red while inserting games into a
+    # Fenwick tree over green/blue ranks, rather than storing a full prefix cube.
+    reds: list[int]
+    green_ranks: list[int]
+    blue_ranks: list[int]
+    ids: list[int]
+    greens: list[int]
+    blues: list[int]
+    power_sum: int
+
+    @classmethod
+    def from_lines(cls, unparsed_games: Iterable[str]) -> GameIndex:
+        return cls.from_columns(GameColumns.from_lines(unparsed_games))
+
+    @classmethod
+    def from_columns(cls, columns: GameColumns) -> GameIndex:
+        possible = columns.reveal_counts > 0
+        reds, greens, blues = (bound[possible] for bound in columns.lower_bounds)
+        ids = columns.ids[possible]
+        order = np.argsort(reds, kind='stable')
+        distinct_greens = np.unique(greens)
+        distinct_blues = np.unique(blues)
+        return GameIndex(
+            reds=reds[order].tolist(),
+            green_ranks=(np.searchsorted(distinct_greens, greens[order]) + 1).tolist(),
+            blue_ranks=(np.searchsorted(distinct_blues, blues[order]) + 1).tolist(),
+            ids=ids[order].tolist(),
+            greens=distinct_greens.tolist(),
+            blues=distinct_blues.tolist(),
+            power_sum=columns.sum_powers(),
+        )
+
+    def sum_possible_ids(self, bags: Iterable[BagContent]) -> list[int]:
+        bags = list(bags)
+        tree = [[0] * (len(self.blues) + 1) for _ in range(len(self.greens) + 1)]
+        id_sums = [0] * len(bags)
+        inserted = 0
+        for query in sorted(range(len(bags)), key=lambda ix: bags[ix].red):
+            bag = bags[query]
+            while inserted < len(self.reds) and self.reds[inserted] <= bag.red:
+                fenwick_add(tree, self.green_ranks[inserted], self.blue_ranks[inserted], self.ids[inserted])
+                inserted += 1
+            id_sums[query] = fenwick_prefix_sum(
+                tree,
+                bisect_right(self.greens, bag.green),
+                bisect_right(self.blues, bag.blue),
+            )
+        return id_sums
 
 
-def sum_powers(unparsed_games: list[str]) -> int:
-    games = [game(unparsed_game).result for unparsed_game in unparsed_games]
-    return sum(game.get_lower_bound().power() for game in games)
+def collect_possible_games(unparsed_games: Iterable[str], bag: BagContent) -> int:
+    return GameIndex.from_lines(unparsed_games).sum_possible_ids([bag])[0]
+
+
+def sum_powers(unparsed_games: Iterable[str]) -> int:
+    return GameIndex.from_lines(unparsed_games).power_sum
 
 assert not Game(id_=1, bags=[]).is_possible_with(BagContent(1, 2, 3))
 assert not Game(id_=1, bags=[BagContent(12, 2, 3)]).is_possible_with(BagContent(1, 2, 3))
@@ -139,8 +283,59 @@ assert sum_powers(
     ],
 ) == 4 * 6 * 2 + 9 * 4 * 2
 
+columns = GameColumns.from_lines([
+    "Game 1: 3 blue, 4 red; 1 red, 2 green, 6 blue; 2 green",
+    "Game 7: 9 blue, 4 red; 1 red, 2 green, 6 blue; 2 green",
+    "Game 8: 1 red, 1 red",
+])
+assert list(columns.ids) == [1, 7, 8]
+assert list(columns.offsets) == [0, 3, 6, 7]
+assert [list(bound) for bound in columns.lower_bounds] == [[4, 4, 2], [2, 2, 0], [6, 9, 0]]
+assert columns.sum_possible_ids(BagContent(red=4, green=2, blue=6)) == 1 + 8
+assert columns.sum_powers() == 4 * 2 * 6 + 4 * 2 * 9
+assert GameColumns.from_lines(['']).sum_powers() == 0
+
+gapped = GameColumns(
+    ids=np.array([3, 4, 5]),
+    offsets=np.array([0, 0, 2, 2]),
+    red=np.array([1, 5]),
+    green=np.array([2, 1]),
+    blue=np.array([0, 3]),
+)
+assert [list(bound) for bound in gapped.lower_bounds] == [[0, 5, 0], [0, 2, 0], [0, 3, 0]]
+assert gapped.sum_possible_ids(BagContent(red=9, green=9, blue=9)) == 4
+
+index = GameIndex.from_columns(columns)
+assert index.power_sum == columns.sum_powers()
+assert index.sum_possible_ids([
+    BagContent(red=4, green=2, blue=6),
+    BagContent(red=100, green=100, blue=100),
+    BagContent(red=3, green=100, blue=100),
+    BagContent(),
+]) == [1 + 8, 1 + 7 + 8, 8, 0]
+assert GameIndex.from_lines(['']).sum_possible_ids([BagContent(1, 1, 1)]) == [0]
+
 with open('day2_input', 'r') as f:
     unparsed_games = [line for line in f]
 
+assert collect_possible_games(unparsed_games, BagContent(red=12, green=13, blue=14)) == sum(
+    parsed.id_
+    for parsed in (game(unparsed_game.strip()).result for unparsed_game in unparsed_games)
+    if parsed.is_possible_with(BagContent(red=12, green=13, blue=14))
+)
+
+bags = [
+    BagContent(red=red, green=green, blue=blue)
+    for red, green, blue in product(range(0, 22), range(0, 22), range(0, 22))
+]
+columns = GameColumns.from_lines(unparsed_games)
+index = GameIndex.from_columns(columns)
+assert index.sum_possible_ids(bags[::97]) == [columns.sum_possible_ids(bag) for bag in bags[::97]]
+
 print(sum_powers(unparsed_games))
 
+if __name__ == '__main__':
+    start = perf_counter()
+    GameIndex.from_lines(unparsed_games).sum_possible_ids(bags)
+    print(perf_counter() - start)
+
@@ -1,6 +1,8 @@
 from dataclasses import dataclass, field
 from itertools import groupby
+
 from parsing import *
+from schematic import part_numbers, read_rows
 
 
 @dataclass
@@ -79,7 +81,6 @@ def parse_document(to_parse: str) -> PartsDocument:
     return list(map(int, result)), parsed
 
 
-
 assert symbol('boink').result == CouldNotParse()
 for s in symbols:
     assert symbol(s).result == Symbol()
@@ -137,6 +138,15 @@ assert res[0] == [
     726, 511, 320, 899, 72, 731,
     502, 80, 458, 377, 659
 ], res
+assert list(part_numbers(['.3.*..', '&..4*.', '&.5.*.'])) == [3, 4]
+assert list(part_numbers(['.35*...', '...4*.9', '&.5.*..', '.......', '..#....', '...499.'])) == [35, 4, 499]
+assert list(part_numbers(['...', '.3.', '...'])) == []
+assert list(part_numbers(['*..', '.3.', '...'])) == [3]
+assert list(part_numbers(['...', '.3.', '..*'])) == [3]
+assert list(part_numbers(['.35..', '....*'])) == []
+assert list(part_numbers(['.35..', '...*.'])) == [35]
+assert list(part_numbers(['12*\n', '..3\n'])) == [12, 3]
+assert list(part_numbers([])) == []
 
 def print_parsed(parsed: PartsDocument) -> str:
     return '\n'.join(
@@ -158,10 +168,6 @@ def print_character(c: N | S | Digit) -> str:
     else:
         return c.digit
 
-with open('day3_input') as f:
-    lines = ''.join([line for line in f])
-    print(lines)
-result, parsed = parse_document(lines)
+result = list(part_numbers(read_rows('day3_input')))
 assert 456 in result
 print(sum(result))
-
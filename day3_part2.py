@@ -1,6 +1,8 @@
 from dataclasses import dataclass, field
 from itertools import groupby
+
 from parsing import *
+from schematic import Gear, find_gears, gear_ratios, read_rows
 
 
 @dataclass
@@ -84,7 +86,6 @@ def parse_document(to_parse: str) -> PartsDocument:
     return result
 
 
-
 assert symbol('boink').result == CouldNotParse()
 for s in symbols:
     assert symbol(s).result == Symbol()
@@ -108,6 +109,16 @@ input_ = '\n'.join([
 ])
 
 assert sum(parse_document(input_)) == 467835
+assert sum(gear_ratios(input_.split('\n'))) == 467835
+assert list(find_gears(input_.split('\n'))) == [
+    Gear(1, 3, (467, 35)),
+    Gear(4, 3, (617,)),
+    Gear(8, 5, (755, 598)),
+]
+assert list(find_gears(['11.', '*22', '3..'])) == [Gear(1, 0, (11, 22, 3))]
+assert list(gear_ratios(['11.', '*22', '3..'])) == []
+assert list(gear_ratios(['5*5'])) == [25]
+assert list(gear_ratios(['*'])) == []
 
 def print_parsed(parsed: PartsDocument) -> str:
     return '\n'.join(
@@ -129,9 +140,4 @@ def print_character(c: N | S | Digit) -> str:
     else:
         return c.digit
 
-with open('day3_input') as f:
-    lines = ''.join([line for line in f])
-    print(lines)
-result = parse_document(lines)
-print(sum(result))
-
+print(sum(gear_ratios(read_rows('day3_input'))))
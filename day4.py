@@ -1,13 +1,101 @@
+import operator
+import random
+from collections import defaultdict
+from functools import reduce
+from itertools import starmap
+from time import perf_counter
+from typing import Iterable
+
 from parsing import *
 
 
+Card = tuple[set[int], set[int]]
+CardMask = tuple[int, int]
+
+
 def points(to_parse: str) -> int:
-    pass
+    return tally(match_counts(parse_card_masks(to_parse.split('\n'))))[0]
+
+
+def count_cards(match_counts: Iterable[int]) -> int:
+    return tally(match_counts)[1]
+
+
+def tally(match_counts: Iterable[int]) -> tuple[int, int]:
+    total_points = 0
+    total_cards = 0
+    copies = 0
+    copies_won: defaultdict[int, int] = defaultdict(int)
+    for index, match_count in enumerate(match_counts):
+        copies += copies_won.pop(index, 0)
+        card_count = 1 + copies
+        total_cards += card_count
+        if match_count == 0:
+            continue
+        total_points += 1 << (match_count - 1)
+        copies_won[index + 1] += card_count
+        copies_won[index + 1 + match_count] -= card_count
+    return total_points, total_cards
+
+
+def match_count(card_: Card) -> int:
+    winning, actual = card_
+    return len(winning & actual)
+
+
+def match_counts(card_masks: Iterable[CardMask]) -> list[int]:
+    return list(map(int.bit_count, starmap(operator.and_, card_masks)))
+
+
+def bitmask(numbers: Iterable[int]) -> int:
+    return reduce(operator.or_, map((1).__lshift__, numbers), 0)
+
+
+def parse_card_masks(lines: Iterable[str]) -> list[CardMask]:
+    return [parse_card_mask(line) for line in lines if line.strip() != '']
 
-card_header = right(right(word('Card '), nonnegative_integer), word(': '))
-numbers = apply(set, separated_by_(nonnegative_integer, many_plus(word(' '))))
+
+def parse_card_mask(line: str) -> CardMask:
+    _, _, all_numbers = line.partition(':')
+    winning, _, actual = all_numbers.partition('|')
+    return bitmask(map(int, winning.split())), bitmask(map(int, actual.split()))
+
+
+def parse_card(line: str) -> Card:
+    _, _, all_numbers = line.partition(':')
+    winning, _, actual = all_numbers.partition('|')
+    return set(map(int, winning.split())), set(map(int, actual.split()))
+
+
+def won_copies(cards: list[Card], index: int) -> list[int]:
+    copies_won = list(range(index + 1, min(index + 1 + match_count(cards[index]), len(cards))))
+    result = []
+    result.extend(copies_won)
+    for copy in copies_won:
+        result.extend(won_copies(cards, copy))
+    return result
+
+
+def count_cards_recursively(cards: list[Card]) -> int:
+    return len(cards) + sum(
+        len(won_copies(cards, index))
+        for index in range(len(cards))
+    )
+
+
+def generate_cards() -> list[Card]:
+    return [
+        (set(random.sample(range(10), 4)), set(random.sample(range(10), 4)))
+        for _ in range(random.randint(0, 12))
+    ]
+
+
+whitespace = many_plus(word(' '))
+padded_integer = right(many(word(' ')), nonnegative_integer)
+card_header = left(right(right(word('Card'), whitespace), nonnegative_integer), word(':'))
+numbers = apply(set, many_plus(padded_integer))
 card = right(card_header, numbers)
-winning_numbers = right(word(' | '), numbers)
+winning_numbers = right(word(' |'), numbers)
 game = and_(card, winning_numbers, lambda t, s: (t, s))
 
 
@@ -45,10 +133,42 @@ assert and_(word('hi'), winning_numbers, lambda t, s: s)('hi | 86 6').result ==
 assert many(word('b'))('bbbb ').result == 4 * ['b']
 assert and_(word('b'), word('a'))('ba ').result == ('b', 'a')
 
-assert separated_by_(word('a'), many(word('b')))('aba ').result == ['a', 'a']
+assert separated_by_(word('a'), word('b'))('aba ').result == ['a', 'a']
 
 assert numbers('12 ').result == {12}
 assert and_(numbers, winning_numbers, lambda t, s: (t, s))('41 48 | 86  6 48 53').result == ({41, 48}, {86, 6, 48, 53})
 assert game('Card 1: 41 48 | 86  6 48 53').result == ({41, 48}, {86, 6, 48, 53})
 
+assert game('Card  12:  1 48 |  6 48').result == ({1, 48}, {6, 48})
+assert card_header('Card   3:').result == 3
+assert parse_card('Card   3:  1 48 |  6 48 53\n') == ({1, 48}, {6, 48, 53})
+assert all(parse_card(line) == game(line).result for line in example_input.split('\n'))
+assert bitmask([]) == 0
+assert bitmask([0, 3, 3]) == 0b1001
+assert parse_card_mask('Card   3:  1 48 |  6 48 53\n') == (bitmask([1, 48]), bitmask([6, 48, 53]))
+assert match_counts(parse_card_masks(example_input.split('\n'))) == [4, 2, 2, 1, 0, 0]
+assert parse_card_masks(['Card 1: 1 | 1\n', '\n', '']) == [(bitmask([1]), bitmask([1]))]
+assert match_counts([]) == []
+assert match_counts([(bitmask([1, 99, 100]), bitmask([99, 100, 2]))]) == [2]
+
 assert points(example_input) == 13
+assert count_cards(match_counts(parse_card_masks(example_input.split('\n')))) == 30
+assert tally(match_counts(parse_card_masks('Card 1: 1 | 1\n'.split('\n')))) == (1, 1)
+assert points('Card 1: 1 | 1\n\n') == 1
+assert tally([4, 2, 2, 1, 0, 0]) == (8 + 2 + 2 + 1, 30)
+assert tally([]) == (0, 0)
+assert tally([5]) == (16, 1)
+assert tally([1, 0]) == (1, 3)
+assert count_cards_recursively(list(map(parse_card, example_input.split('\n')))) == 30
+for _ in range(200):
+    random_cards = generate_cards()
+    assert count_cards(map(match_count, random_cards)) == count_cards_recursively(random_cards), random_cards
+
+with open('day4_input', 'r') as f:
+    print(tally(match_counts(parse_card_masks(f))))
+
+if __name__ == '__main__':
+    start = perf_counter()
+    with open('day4_input', 'r') as f:
+        tally(match_counts(parse_card_masks(f)))
+    print(perf_counter() - start)
@@ -1,8 +1,16 @@
 import math
-from typing import Iterable
+import random
+from time import perf_counter
+from typing import Iterable, Sequence
+
+import numpy as np
 
 from parsing import *
 from dataclasses import dataclass
+
+
+INT64_MAX = np.iinfo(np.int64).max
+
 example_data = """Time:      7  15   30
 Distance:  9  40  200
 """
@@ -21,28 +29,68 @@ def create_race_params(
     return RaceParams(time_given, distance_to_beat)
 
 
-def ceil_without_edge(my_float: float) -> int:
-    ceiled = math.ceil(my_float)
-    if my_float == ceiled:
-        return ceiled + 1
-    return ceiled
-
-
-def floor_without_edge(my_float: float) -> int:
-    floored = math.floor(my_float)
-    if my_float == floored:
-        return floored - 1
-    return floored
+def first_winning_hold(race_params: RaceParams) -> int:
+    time_given = race_params.time_given
+    distance_to_beat = race_params.distance_to_beat
+    discriminant = time_given ** 2 - 4 * distance_to_beat
+    hold = max((time_given - math.isqrt(max(discriminant, 0))) // 2, 0)
+    while hold * (time_given - hold) <= distance_to_beat and 2 * hold <= time_given:
+        hold += 1
+    return hold
 
 
 def ways_to_win(race_params: RaceParams) -> int:
-    lower_bound = max(
-        (race_params.time_given - math.sqrt(race_params.time_given ** 2 - 4 * race_params.distance_to_beat))/2,
-        0,
+    if race_params.time_given ** 2 < 4 * race_params.distance_to_beat:
+        return 0
+    return max(race_params.time_given - 2 * first_winning_hold(race_params) + 1, 0)
+
+
+def ways_to_win_many(races: Iterable[RaceParams]) -> list[int]:
+    return list(map(ways_to_win, races))
+
+
+def ways_to_win_batch(times: Sequence[int], distances: Sequence[int]) -> list[int]:
+    largest_time = max(times, default=0)
+    smallest_distance = min(distances, default=0)
+    largest_distance = max(distances, default=0)
+    if (
+        largest_time * largest_time - 4 * min(smallest_distance, 0) > INT64_MAX
+        or 4 * largest_distance > INT64_MAX
+    ):
+        return exact_ways_to_win_batch(times, distances)
+
+    time_given = np.array(times, dtype=np.int64)
+    distance = np.array(distances, dtype=np.int64)
+    discriminant = time_given * time_given - 4 * distance
+    root = np.sqrt(np.maximum(discriminant, 0).astype(np.float64))
+    hold = np.maximum(np.floor((time_given - root) / 2).astype(np.int64), 0)
+    # The float root is within one hold of the exact one, so nudge each hold onto
+    # the first winning one.
+    hold -= (hold > 0) & ((hold - 1) * (time_given - hold + 1) > distance)
+    hold += hold * (time_given - hold) <= distance
+    ways = np.where(discriminant >= 0, np.maximum(time_given - 2 * hold + 1, 0), 0)
+    return ways.tolist()
+
+
+def exact_ways_to_win_batch(times: Sequence[int], distances: Sequence[int]) -> list[int]:
+    discriminants = [time_given * time_given - 4 * distance for time_given, distance in zip(times, distances)]
+    roots = map(math.isqrt, map(max, discriminants, [0] * len(discriminants)))
+    holds = [max((time_given - root) // 2, 0) for time_given, root in zip(times, roots)]
+    holds = [
+        hold + (hold * (time_given - hold) <= distance)
+        for hold, time_given, distance in zip(holds, times, distances)
+    ]
+    return [
+        max(time_given - 2 * hold + 1, 0) if discriminant >= 0 else 0
+        for hold, time_given, discriminant in zip(holds, times, discriminants)
+    ]
+
+
+def brute_force_ways_to_win(race_params: RaceParams) -> int:
+    return sum(
+        hold * (race_params.time_given - hold) > race_params.distance_to_beat
+        for hold in range(race_params.time_given + 1)
     )
-    upper_bound = min((race_params.time_given + math.sqrt(race_params.time_given ** 2 - 4 * race_params.distance_to_beat))/2, race_params.time_given)
-    result = 1 + floor_without_edge(upper_bound) - ceil_without_edge(lower_bound)
-    return result
 
 
 def main(data: str) -> int:
@@ -67,6 +115,13 @@ times = right(time_header, values)
 distances = right(distance_header, values)
 document = and_(times, right(word('\n'), distances), create_race_params)
 
+separate_values = separated_by_(nonnegative_integer, whitespace)
+races_document = and_(
+    right(time_header, separate_values),
+    right(word('\n'), right(distance_header, separate_values)),
+    lambda ts, ds: list(zipwith(create_race_params)(ts, ds)),
+)
+
 
 assert whitespace('   ').result == [' ', ' ', ' ']
 assert times('Time:   9  10 11').result == 91011
@@ -75,7 +130,55 @@ assert document('Time:    1 2 3\nDistance: 4 5  6').result == RaceParams(123, 45
 
 assert main(example_data) == 71503, main(example_data)
 
+assert races_document(example_data).result == [RaceParams(7, 9), RaceParams(15, 40), RaceParams(30, 200)]
+assert ways_to_win_many(races_document(example_data).result) == [4, 8, 9]
+assert ways_to_win_many([]) == []
+assert all(
+    ways_to_win(RaceParams(time_given, distance_to_beat)) == brute_force_ways_to_win(RaceParams(time_given, distance_to_beat))
+    for time_given in range(40)
+    for distance_to_beat in range(-3, 420)
+)
+big_time = 10 ** 30 + 7
+big_race = RaceParams(big_time, (big_time // 2) * (big_time - big_time // 2) - 10 ** 20)
+big_hold = first_winning_hold(big_race)
+assert big_hold * (big_time - big_hold) > big_race.distance_to_beat
+assert (big_hold - 1) * (big_time - big_hold + 1) <= big_race.distance_to_beat
+assert ways_to_win(big_race) == big_time - 2 * big_hold + 1
+
+small_races = [
+    RaceParams(time_given, distance_to_beat)
+    for time_given in range(40)
+    for distance_to_beat in range(-3, 420)
+]
+assert ways_to_win_batch(
+    [race.time_given for race in small_races],
+    [race.distance_to_beat for race in small_races],
+) == ways_to_win_many(small_races)
+assert exact_ways_to_win_batch(
+    [race.time_given for race in small_races],
+    [race.distance_to_beat for race in small_races],
+) == ways_to_win_many(small_races)
+assert ways_to_win_batch([7, 15, 30], [9, 40, 200]) == [4, 8, 9]
+near_limit_races = [
+    RaceParams(time_given, time_given * time_given // 4 - offset)
+    for time_given in (3 * 10 ** 9 - 1, 3 * 10 ** 9, 2 ** 31 + 12345)
+    for offset in (-1, 0, 1, 2, 10 ** 9, 10 ** 17)
+]
+assert ways_to_win_batch(
+    [race.time_given for race in near_limit_races],
+    [race.distance_to_beat for race in near_limit_races],
+) == ways_to_win_many(near_limit_races)
+assert ways_to_win_batch([big_time], [big_race.distance_to_beat]) == [ways_to_win(big_race)]
+assert ways_to_win_batch([], []) == []
+
 with open('day6_input', 'r') as f:
     input_ = f.read()
 
 print(main(input_))
+
+if __name__ == '__main__':
+    random_times = [random.randint(1, 10 ** 6) for _ in range(10 ** 6)]
+    random_distances = [random.randint(0, time_given ** 2 // 4) for time_given in random_times]
+    start = perf_counter()
+    ways_to_win_batch(random_times, random_distances)
+    print(perf_counter() - start)
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import random
 import time
 from collections import Counter
 from enum import Enum
 from functools import cached_property
 from itertools import count
+from typing import Iterator, Sequence
+
+import numpy as np
 
 from parsing import *
 from dataclasses import dataclass
@@ -26,6 +30,39 @@ class HandType(Enum):
         return self.value <= other.value
 
 
+signature_types = {
+    (5,): HandType.FIVE,
+    (4, 1): HandType.FOUR,
+    (3, 2): HandType.FULL_HOUSE,
+    (3, 1, 1): HandType.THREE,
+    (2, 2, 1): HandType.TWO,
+    (2, 1, 1, 1): HandType.ONE,
+    (1, 1, 1, 1, 1): HandType.HIGH,
+}
+
+
+def partitions(n: int, largest: int | None = None) -> Iterator[tuple[int, ...]]:
+    if n == 0:
+        yield ()
+        return
+    for part in range(min(n, largest or n), 0, -1):
+        for rest in partitions(n - part, part):
+            yield (part, *rest)
+
+
+def promote_jokers(signature: tuple[int, ...], jokers: int) -> tuple[int, ...]:
+    if len(signature) == 0:
+        return (jokers,)
+    return (signature[0] + jokers, *signature[1:])
+
+
+hand_type_table: dict[tuple[tuple[int, ...], int], HandType] = {
+    (signature, jokers): signature_types[promote_jokers(signature, jokers)]
+    for jokers in range(6)
+    for signature in partitions(5 - jokers)
+}
+
+
 @dataclass(frozen=True)
 class Line:
     cards: Hand
@@ -40,28 +77,12 @@ class Hand:
         assert len(self.cards) == 5, self.cards
 
     @cached_property
-    def _card_counts(self) -> Counter[int]:
-        return Counter(Counter(self.cards).values())
-
-    @cached_property
-    def _non_joker_card_counts(self) -> Counter[int]:
-        return Counter(Counter([card for card in self.cards if card != Card.J]).values())
+    def type(self) -> HandType:
+        return joker_rules.hand_type(self.cards)
 
     @cached_property
-    def type(self) -> HandType:
-        if self._non_joker_card_counts in ({4: 1}, {3: 1}, {2: 1}, {1: 1}, {5: 1}, {}):
-            return HandType.FIVE
-        if self._non_joker_card_counts in ({3: 1, 1: 1}, {2: 1, 1: 1}, {1: 2}) or self._card_counts.get(4) == 1:
-            return HandType.FOUR
-        if self._card_counts == {2: 1, 3: 1} or self._non_joker_card_counts == {2: 2}:
-            return HandType.FULL_HOUSE
-        if 3 in self._card_counts or self._non_joker_card_counts in ({2: 1, 1: 2}, {1: 3}):
-            return HandType.THREE
-        if self._card_counts == {2: 2, 1: 1}:
-            return HandType.TWO
-        if self._card_counts == {2: 1, 1: 3} or self._non_joker_card_counts == {1: 4}:
-            return HandType.ONE
-        return HandType.HIGH
+    def key(self) -> int:
+        return joker_rules.key(self.cards)
 
     def __le__(self, other: Hand) -> bool:
         if self.type == other.type:
@@ -109,6 +130,33 @@ digits_list = [
     Card.NINE,
 ]
 
+
+@dataclass(frozen=True)
+class Rules:
+    card_order: tuple[Card, ...]
+    wildcard: Card | None = None
+
+    @cached_property
+    def ranks(self) -> dict[Card, int]:
+        return {card_: rank for rank, card_ in enumerate(self.card_order)}
+
+    def hand_type(self, cards: tuple[Card, ...]) -> HandType:
+        counts = Counter(card_ for card_ in cards if card_ != self.wildcard)
+        signature = tuple(sorted(counts.values(), reverse=True))
+        return hand_type_table[signature, len(cards) - sum(signature)]
+
+    def key(self, cards: tuple[Card, ...]) -> int:
+        ranks = self.ranks
+        key = self.hand_type(cards).value
+        for card_ in cards:
+            key = key << 4 | ranks[card_]
+        return key
+
+
+standard_rules = Rules(card_order=(*digits_list, Card.T, Card.J, Card.Q, Card.K, Card.A))
+joker_rules = Rules(card_order=(Card.J, *digits_list, Card.T, Card.Q, Card.K, Card.A), wildcard=Card.J)
+
+
 card = apply(
     Card.from_string,
     or_(
@@ -127,13 +175,47 @@ line = and_(hand, right(word(' '), bid), lambda h, b: Line(h, b))
 
 
 def main_parsed(hands: list[Line]) -> int:
-    sorted_hands = sorted(hands, key=lambda hand: hand.cards)
+    sorted_hands = sorted(hands, key=lambda hand: hand.cards.key)
     return sum(
         rank * line.bid
         for rank, line in zip(count(1), sorted_hands)
     )
 
 
+KEY_BITS = 24
+
+
+def radix_argsort(keys: np.ndarray, key_bits: int = KEY_BITS, digit_bits: int = 16) -> np.ndarray:
+    permutation = np.arange(len(keys))
+    mask = (1 << digit_bits) - 1
+    digit_type = np.uint8 if digit_bits <= 8 else np.uint16
+    for shift in range(0, key_bits, digit_bits):
+        digits = ((keys[permutation] >> shift) & mask).astype(digit_type)
+        permutation = permutation[np.argsort(digits, kind='stable')]
+    return permutation
+
+
+def ranked_winnings(keys: np.ndarray, bids: np.ndarray, chunk_size: int = 1 << 20) -> int:
+    ranked_bids = bids[radix_argsort(keys)].astype(np.int64)
+    ranked_bids *= np.arange(1, len(keys) + 1, dtype=np.int64)
+    return sum(
+        int(ranked_bids[start:start + chunk_size].sum())
+        for start in range(0, len(ranked_bids), chunk_size)
+    )
+
+
+def total_winnings(lines: list[Line], rule_sets: Sequence[Rules]) -> list[int]:
+    keys_per_rules: list[list[int]] = [[] for _ in rule_sets]
+    for line_ in lines:
+        for keys, rules in zip(keys_per_rules, rule_sets):
+            keys.append(rules.key(line_.cards.cards))
+    bids = np.array([line_.bid for line_ in lines], dtype=np.int64)
+    return [
+        ranked_winnings(np.array(keys, dtype=np.uint32), bids)
+        for keys in keys_per_rules
+    ]
+
+
 def main(to_parse: str) -> int:
     lines = to_parse.split('\n')
     return main_parsed(
@@ -186,10 +268,65 @@ assert Hand((Card.A, Card.A, Card.J, Card.K, Card.Q)).type == HandType.THREE
 assert Hand((Card.A, Card.J, Card.J, Card.K, Card.Q)).type == HandType.THREE
 assert Hand((Card.A, Card.T, Card.J, Card.K, Card.Q)).type == HandType.ONE
 
+assert Hand((Card.J, Card.J, Card.J, Card.J, Card.J)).key == HandType.FIVE.value << 20
+assert Hand((Card.A, Card.T, Card.TWO, Card.Q, Card.K)).key == 0x3C91AB
+example_hands = [
+    five_of_a_kind, four_of_a_kind, four_of_a_kind_different_order, three_of_a_kind,
+    two_pair, one_pair, high_card, full_house,
+    Hand((Card.A, Card.A, Card.J, Card.K, Card.Q)),
+    Hand((Card.J, Card.A, Card.A, Card.K, Card.Q)),
+]
+assert all(
+    (hand_1.key <= hand_2.key) == (hand_1 <= hand_2)
+    for hand_1 in example_hands
+    for hand_2 in example_hands
+)
+
+assert list(partitions(3)) == [(3,), (2, 1), (1, 1, 1)]
+assert len(hand_type_table) == 7 + 5 + 3 + 2 + 1 + 1
+assert hand_type_table[(2, 1), 2] == HandType.FOUR
+assert hand_type_table[(2, 2), 1] == HandType.FULL_HOUSE
+assert hand_type_table[(), 5] == HandType.FIVE
+assert hand_type_table[(2, 2, 1), 0] == HandType.TWO
+
 assert main(example_data) == 5905
 
+example_lines = [line(line_).result for line_ in example_data.split('\n')]
+assert total_winnings(example_lines, [standard_rules, joker_rules]) == [6440, 5905]
+assert total_winnings(example_lines, []) == []
+assert standard_rules.hand_type((Card.J, Card.J, Card.A, Card.K, Card.Q)) == HandType.ONE
+assert joker_rules.hand_type((Card.J, Card.J, Card.A, Card.K, Card.Q)) == HandType.THREE
+assert standard_rules.key((Card.J,) * 5) > standard_rules.key((Card.T,) * 5)
+assert joker_rules.key((Card.J,) * 5) < joker_rules.key((Card.TWO,) * 5)
+assert len(set(standard_rules.ranks.values())) == len(set(joker_rules.ranks.values())) == 13
+assert max(joker_rules.key((Card.A,) * 5), standard_rules.key((Card.A,) * 5)) < 1 << KEY_BITS
+
+random_keys = np.random.randint(0, 1 << KEY_BITS, 10 ** 4, dtype=np.uint32)
+assert (radix_argsort(random_keys) == np.argsort(random_keys, kind='stable')).all()
+assert (radix_argsort(random_keys, digit_bits=8) == np.argsort(random_keys, kind='stable')).all()
+assert (radix_argsort(np.array([3, 1, 3, 2], dtype=np.uint32)) == [1, 3, 0, 2]).all()
+assert ranked_winnings(np.array([3, 1, 2], dtype=np.uint32), np.array([10, 20, 30])) == 20 + 2 * 30 + 3 * 10
+assert ranked_winnings(np.array([], dtype=np.uint32), np.array([], dtype=np.int64)) == 0
+assert ranked_winnings(np.arange(10, dtype=np.uint32)[::-1], np.arange(10), chunk_size=3) == sum(
+    (10 - bid) * bid for bid in range(10)
+)
+
 with open('day7_input', 'r') as f:
     start = time.perf_counter()
-    print(main(f.read()))
+    to_parse = f.read()
+    print(main(to_parse))
     end = time.perf_counter()
     print(end - start)
+
+winnings = total_winnings([line(line_).result for line_ in to_parse.split('\n')], [standard_rules, joker_rules])
+assert winnings[1] == main(to_parse)
+print(winnings)
+
+if __name__ == '__main__':
+    with open('day7_input', 'r') as f:
+        keys = [line(line_).result.cards.key for line_ in f.read().split('\n')]
+    many_keys = np.array(random.choices(keys, k=10 ** 7), dtype=np.uint32)
+    many_bids = np.random.randint(1, 1000, len(many_keys))
+    start = time.perf_counter()
+    ranked_winnings(many_keys, many_bids)
+    print(time.perf_counter() - start)
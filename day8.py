@@ -1,53 +1,401 @@
+from __future__ import annotations
+
+from array import array
 from ast import literal_eval
-from math import lcm
-from typing import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from math import gcd, lcm
+from multiprocessing.shared_memory import SharedMemory
+from time import perf_counter
+from typing import Iterator, Sequence
 from itertools import cycle, count
 
-with open('day8_input') as f:
-    instructions, map_ = literal_eval(f.read())
-
-instructions = instructions.replace('L', '0').replace('R', '1')
-current = 'AAA'
-for score, instruction in zip(count(1), cycle(instructions)):
-    current = map_[current][int(instruction)]
-    if current == 'ZZZ':
-        print(score)
-        break
-
-starting_points = [x for x in map_ if x.endswith('A')]
-print(starting_points)
-
-
-def traverse(starting_point: str) -> Iterator[str]:
-    current = starting_point
-    for instruction in cycle(instructions):
-        current = map_[current][int(instruction)]
-        yield current
-
-
-def detect_cycle(starting_node):
-    last_score = 0
-    previous_difference = 0
-    for score, node in zip(count(1), traverse(starting_node)):
-        if node.endswith('Z'):
-            difference = score - last_score
-            print(f'{score=}')
-            print(score - last_score)
-            last_score = score
-            if difference == previous_difference:
-                return difference
-            previous_difference = difference
-
-
-traversals = map(traverse, starting_points)
-bops = []
-for node in starting_points:
-    print(node)
-    bops.append(detect_cycle(node))
-
-print(bops)
-print(lcm(*bops))
-# for score, *itineraries in zip(count(1), *traversals):
-#     if all(node.endswith('Z') for node in itineraries):
-#         print(score)
-#         break
+
+@dataclass(frozen=True)
+class Network:
+    names: list[str]
+    ids: dict[str, int]
+    left: array
+    right: array
+    instructions: bytes
+    is_end: bytes
+
+    @classmethod
+    def from_map(cls, instructions: str, map_: dict[str, tuple[str, str]]) -> Network:
+        names = list(map_)
+        ids = {name: id_ for id_, name in enumerate(names)}
+        return Network(
+            names=names,
+            ids=ids,
+            left=array('l', (ids[left] for left, _ in map_.values())),
+            right=array('l', (ids[right] for _, right in map_.values())),
+            instructions=bytes('LR'.index(instruction) for instruction in instructions),
+            is_end=bytes(name.endswith('Z') for name in names),
+        )
+
+    def starting_points(self) -> list[int]:
+        return [id_ for id_, name in enumerate(self.names) if name.endswith('A')]
+
+    def traverse(self, start: int) -> Iterator[int]:
+        successors = (self.left, self.right)
+        current = start
+        for instruction in cycle(self.instructions):
+            current = successors[instruction][current]
+            yield current
+
+    def steps_until(self, start: int, end: int) -> int:
+        successors = (self.left, self.right)
+        current = start
+        for score, instruction in zip(count(1), cycle(self.instructions)):
+            current = successors[instruction][current]
+            if current == end:
+                return score
+        raise Exception
+
+
+@dataclass(frozen=True)
+class JumpTable:
+    network: Network
+    cycle_length: int
+    hit_offsets: list[tuple[int, ...]]
+    lifts: list[array]
+    hits: list[bytes]
+
+    @classmethod
+    def from_network(cls, network: Network, targets: bytes) -> JumpTable:
+        successors = (network.left, network.right)
+        cycle_ends = array('l')
+        hit_offsets = []
+        for start in range(len(network.names)):
+            current = start
+            offsets = []
+            for offset, instruction in enumerate(network.instructions, 1):
+                current = successors[instruction][current]
+                if targets[current]:
+                    offsets.append(offset)
+            cycle_ends.append(current)
+            hit_offsets.append(tuple(offsets))
+
+        lifts = [cycle_ends]
+        hits = [bytes(len(offsets) > 0 for offsets in hit_offsets)]
+        for _ in range(len(network.names).bit_length()):
+            lift, hit = lifts[-1], hits[-1]
+            lifts.append(array('l', (lift[node] for node in lift)))
+            hits.append(bytes(hit[node] or hit[lift[node]] for node in range(len(lift))))
+        return JumpTable(network, len(network.instructions), hit_offsets, lifts, hits)
+
+    def walk(self, start: int, steps: int) -> int:
+        cycles, remainder = divmod(steps, self.cycle_length)
+        while len(self.lifts) < cycles.bit_length():
+            lift = self.lifts[-1]
+            self.lifts.append(array('l', (lift[node] for node in lift)))
+        current = start
+        for level in range(cycles.bit_length()):
+            if cycles >> level & 1:
+                current = self.lifts[level][current]
+        successors = (self.network.left, self.network.right)
+        for instruction in self.network.instructions[:remainder]:
+            current = successors[instruction][current]
+        return current
+
+    def steps_until_hit(self, start: int) -> int | None:
+        if not self.hits[-1][start]:
+            return None
+        cycles = 0
+        current = start
+        for level in reversed(range(len(self.hits))):
+            if not self.hits[level][current]:
+                current = self.lifts[level][current]
+                cycles += 1 << level
+        return cycles * self.cycle_length + self.hit_offsets[current][0]
+
+
+@dataclass(frozen=True)
+class GhostPath:
+    prefix_hits: tuple[int, ...]
+    cycle_start: int
+    period: int
+    cycle_hits: tuple[int, ...]
+
+    def hits_at(self, step: int) -> bool:
+        if step < self.cycle_start:
+            return step in self.prefix_hits
+        return (step - self.cycle_start) % self.period + self.cycle_start in self.cycle_hits
+
+    def hits_before(self, bound: int) -> Iterator[int]:
+        for hit in self.prefix_hits:
+            if hit >= bound:
+                return
+            yield hit
+        for cycle_offset in range(0, bound, self.period):
+            for hit in self.cycle_hits:
+                if hit + cycle_offset >= bound:
+                    return
+                yield hit + cycle_offset
+
+
+def analyze_path(table: JumpTable, start: int) -> GhostPath:
+    first_seen: dict[int, int] = {}
+    cycle_starts: list[int] = []
+    node = start
+    while node not in first_seen:
+        first_seen[node] = len(cycle_starts)
+        cycle_starts.append(node)
+        node = table.lifts[0][node]
+
+    hits = [
+        cycle * table.cycle_length + offset
+        for cycle, node in enumerate(cycle_starts)
+        for offset in table.hit_offsets[node]
+    ]
+    cycle_start = first_seen[node] * table.cycle_length + 1
+    return GhostPath(
+        prefix_hits=tuple(hit for hit in hits if hit < cycle_start),
+        cycle_start=cycle_start,
+        period=(len(cycle_starts) - first_seen[node]) * table.cycle_length,
+        cycle_hits=tuple(hit for hit in hits if hit >= cycle_start),
+    )
+
+
+def analyze_start(
+    left: Sequence[int],
+    right: Sequence[int],
+    instructions: Sequence[int],
+    is_end: Sequence[int],
+    start: int,
+) -> GhostPath:
+    successors = (left, right)
+    instruction_count = len(instructions)
+    first_seen: dict[int, int] = {}
+    hits = []
+    node, step = start, 0
+    while (state := node * instruction_count + step % instruction_count) not in first_seen:
+        first_seen[state] = step
+        node = successors[instructions[step % instruction_count]][node]
+        step += 1
+        if is_end[node]:
+            hits.append(step)
+    cycle_start = first_seen[state] + 1
+    return GhostPath(
+        prefix_hits=tuple(hit for hit in hits if hit < cycle_start),
+        cycle_start=cycle_start,
+        period=step - first_seen[state],
+        cycle_hits=tuple(hit for hit in hits if hit >= cycle_start),
+    )
+
+
+@dataclass(frozen=True)
+class SharedNetwork:
+    memory: SharedMemory
+    left: memoryview
+    right: memoryview
+    is_end: memoryview
+    instructions: memoryview
+
+    @classmethod
+    def attach(cls, name: str, node_count: int, instruction_count: int) -> SharedNetwork:
+        memory = SharedMemory(name=name)
+        buffer = memory.buf
+        assert buffer is not None
+        return SharedNetwork(
+            memory=memory,
+            left=buffer[:4 * node_count].cast('i'),
+            right=buffer[4 * node_count:8 * node_count].cast('i'),
+            is_end=buffer[8 * node_count:9 * node_count],
+            instructions=buffer[9 * node_count:9 * node_count + instruction_count],
+        )
+
+
+shared_network: SharedNetwork | None = None
+
+
+def attach_shared_network(name: str, node_count: int, instruction_count: int) -> None:
+    global shared_network
+    shared_network = SharedNetwork.attach(name, node_count, instruction_count)
+
+
+def analyze_shared_start(start: int) -> GhostPath:
+    assert shared_network is not None
+    return analyze_start(
+        shared_network.left,
+        shared_network.right,
+        shared_network.instructions,
+        shared_network.is_end,
+        start,
+    )
+
+
+def analyze_starts_in_parallel(network: Network, starts: list[int], max_workers: int | None = None) -> list[GhostPath]:
+    node_count, instruction_count = len(network.names), len(network.instructions)
+    memory = SharedMemory(create=True, size=9 * node_count + instruction_count)
+    try:
+        buffer = memory.buf
+        assert buffer is not None
+        buffer[:4 * node_count] = array('i', network.left).tobytes()
+        buffer[4 * node_count:8 * node_count] = array('i', network.right).tobytes()
+        buffer[8 * node_count:9 * node_count] = network.is_end
+        buffer[9 * node_count:9 * node_count + instruction_count] = network.instructions
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=attach_shared_network,
+            initargs=(memory.name, node_count, instruction_count),
+        ) as pool:
+            return list(pool.map(analyze_shared_start, starts))
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+def combine_congruences(a: int, m: int, b: int, n: int) -> int | None:
+    g = gcd(m, n)
+    if (b - a) % g != 0:
+        return None
+    return (a + m * ((b - a) // g * pow(m // g, -1, n // g) % (n // g))) % lcm(m, n)
+
+
+def earliest_common_hit(paths: list[GhostPath]) -> int | None:
+    bound = max(path.cycle_start for path in paths)
+    for step in paths[0].hits_before(bound):
+        if all(path.hits_at(step) for path in paths):
+            return step
+
+    residues, modulus = {0}, 1
+    for path in paths:
+        path_residues = {hit % path.period for hit in path.cycle_hits}
+        residues = {
+            combined
+            for residue in residues
+            for path_residue in path_residues
+            if (combined := combine_congruences(residue, modulus, path_residue, path.period)) is not None
+        }
+        modulus = lcm(modulus, path.period)
+    if len(residues) == 0:
+        return None
+    return min(residue + (bound - residue + modulus - 1) // modulus * modulus for residue in residues)
+
+
+def brute_force_common_hit(network: Network, starts: list[int], max_steps: int) -> int | None:
+    for step, nodes in zip(range(1, max_steps), zip(*map(network.traverse, starts))):
+        if all(network.is_end[node] for node in nodes):
+            return step
+    return None
+
+
+example_1 = Network.from_map('RL', {
+    'AAA': ('BBB', 'CCC'),
+    'BBB': ('DDD', 'EEE'),
+    'CCC': ('ZZZ', 'GGG'),
+    'DDD': ('DDD', 'DDD'),
+    'EEE': ('EEE', 'EEE'),
+    'GGG': ('GGG', 'GGG'),
+    'ZZZ': ('ZZZ', 'ZZZ'),
+})
+example_2 = Network.from_map('LLR', {
+    'AAA': ('BBB', 'BBB'),
+    'BBB': ('AAA', 'ZZZ'),
+    'ZZZ': ('ZZZ', 'ZZZ'),
+})
+example_3 = Network.from_map('LR', {
+    '11A': ('11B', 'XXX'),
+    '11B': ('XXX', '11Z'),
+    '11Z': ('11B', 'XXX'),
+    '22A': ('22B', 'XXX'),
+    '22B': ('22C', '22C'),
+    '22C': ('22Z', '22Z'),
+    '22Z': ('22B', '22B'),
+    'XXX': ('XXX', 'XXX'),
+})
+
+assert example_1.instructions == bytes([1, 0])
+assert list(example_1.left) == [1, 3, 6, 3, 4, 5, 6]
+assert example_1.is_end == bytes([0, 0, 0, 0, 0, 0, 1])
+assert example_1.steps_until(example_1.ids['AAA'], example_1.ids['ZZZ']) == 2
+assert example_2.steps_until(example_2.ids['AAA'], example_2.ids['ZZZ']) == 6
+assert [example_3.names[node] for node in example_3.starting_points()] == ['11A', '22A']
+example_4 = Network.from_map('L', {
+    '1A': ('1Z', '1Z'),
+    '1Z': ('1B', '1B'),
+    '1B': ('1Z', '1Z'),
+    '2A': ('2B', '2B'),
+    '2B': ('2C', '2C'),
+    '2C': ('2Z', '2Z'),
+    '2Z': ('2B', '2B'),
+    '3A': ('3Z', '3Z'),
+    '3Z': ('3B', '3B'),
+    '3B': ('3B', '3B'),
+})
+example_4_table = JumpTable.from_network(example_4, example_4.is_end)
+assert analyze_path(example_4_table, example_4.ids['1A']) == GhostPath((1,), 2, 2, (3,))
+assert analyze_path(example_4_table, example_4.ids['2A']) == GhostPath((), 2, 3, (3,))
+assert analyze_path(example_4_table, example_4.ids['3A']) == GhostPath((1,), 3, 1, ())
+assert earliest_common_hit([analyze_path(example_4_table, example_4.ids[name]) for name in ['1A', '2A']]) == 3
+assert earliest_common_hit([analyze_path(example_4_table, example_4.ids[name]) for name in ['1A', '3A']]) == 1
+assert earliest_common_hit([analyze_path(example_4_table, example_4.ids[name]) for name in ['2A', '3A']]) is None
+assert combine_congruences(1, 2, 0, 3) == 3
+assert combine_congruences(1, 4, 0, 6) is None
+assert combine_congruences(2, 4, 0, 6) == 6
+assert analyze_start(example_4.left, example_4.right, example_4.instructions, example_4.is_end, example_4.ids['1A']) == GhostPath((1,), 2, 2, (3,))
+example_3_table = JumpTable.from_network(example_3, example_3.is_end)
+assert earliest_common_hit([analyze_path(example_3_table, node) for node in example_3.starting_points()]) == 6
+for example in [example_1, example_2, example_3, example_4]:
+    example_table = JumpTable.from_network(example, example.is_end)
+    for node_1 in range(len(example.names)):
+        for node_2 in range(len(example.names)):
+            assert earliest_common_hit(
+                [analyze_path(example_table, node_1), analyze_path(example_table, node_2)]
+            ) == brute_force_common_hit(example, [node_1, node_2], 100)
+    direct_paths = [
+        analyze_start(example.left, example.right, example.instructions, example.is_end, node)
+        for node in range(len(example.names))
+    ]
+    assert all(
+        direct_path.hits_at(step) == analyze_path(example_table, node).hits_at(step)
+        for node, direct_path in enumerate(direct_paths)
+        for step in range(1, 100)
+    )
+
+for example in [example_1, example_2, example_3]:
+    example_table = JumpTable.from_network(example, example.is_end)
+    for node in range(len(example.names)):
+        walked = list(zip(range(1, 50), example.traverse(node)))
+        assert all(example_table.walk(node, steps) == reached for steps, reached in walked)
+        first_hit = next((steps for steps, reached in walked if example.is_end[reached]), None)
+        assert example_table.steps_until_hit(node) == first_hit, (example.names[node], first_hit)
+assert example_table.walk(example_3.ids['22A'], 10 ** 18) == example_3.ids['22B']
+assert example_table.walk(example_3.ids['22A'], 0) == example_3.ids['22A']
+
+if __name__ == '__main__':
+    for example in [example_1, example_2, example_3, example_4]:
+        direct_paths = [
+            analyze_start(example.left, example.right, example.instructions, example.is_end, node)
+            for node in range(len(example.names))
+        ]
+        assert analyze_starts_in_parallel(example, list(range(len(example.names))), max_workers=2) == direct_paths
+
+    with open('day8_input') as f:
+        network = Network.from_map(*literal_eval(f.read()))
+
+    start = perf_counter()
+    print(network.steps_until(network.ids['AAA'], network.ids['ZZZ']))
+    print(perf_counter() - start)
+
+    start = perf_counter()
+    zzz_table = JumpTable.from_network(network, bytes(name == 'ZZZ' for name in network.names))
+    print(perf_counter() - start)
+    start = perf_counter()
+    assert zzz_table.steps_until_hit(network.ids['AAA']) == network.steps_until(network.ids['AAA'], network.ids['ZZZ'])
+    print(zzz_table.walk(network.ids['AAA'], 10 ** 100))
+    print(perf_counter() - start)
+
+    start = perf_counter()
+    starting_points = network.starting_points()
+    print([network.names[node] for node in starting_points])
+    end_table = JumpTable.from_network(network, network.is_end)
+    paths = [analyze_path(end_table, node) for node in starting_points]
+    print(earliest_common_hit(paths))
+    print(perf_counter() - start)
+
+    start = perf_counter()
+    parallel_paths = analyze_starts_in_parallel(network, starting_points)
+    print(earliest_common_hit(parallel_paths))
+    print(perf_counter() - start)
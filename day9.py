@@ -1,9 +1,13 @@
 from __future__ import annotations
 
 import random
-from fractions import Fraction
-from functools import lru_cache
-from typing import TypeVar
+from array import array
+from collections import OrderedDict, defaultdict
+from math import comb
+from time import perf_counter
+from typing import Sequence, TypeVar
+
+import numpy as np
 
 from parsing import separated_by, integer
 from property_based_testing.api import inject
@@ -13,15 +17,54 @@ T = TypeVar('T')
 example_data = """0 3 6 9 12 15\n1 3 6 10 15 21\n10 13 16 21 30 45"""
 
 
-@lru_cache(maxsize=None)
-def frac_binom(n: int, k: int) -> Fraction:
-    if k == 0 or n == k:
-        return Fraction(1, 1)
-    return frac_binom(n - 1, k - 1) * Fraction(n, k)
+INT64_MAX = int(np.iinfo(np.int64).max)
+
+
+class PascalTriangle:
+    def __init__(self, row_limit: int = 128) -> None:
+        self.row_limit = row_limit
+        self._rows: OrderedDict[int, Sequence[int]] = OrderedDict()
+        self._frontier: tuple[int, Sequence[int]] = (0, array('q', [1]))
+
+    def row(self, n: int) -> Sequence[int]:
+        if n in self._rows:
+            self._rows.move_to_end(n)
+            return self._rows[n]
+
+        start, row = self._frontier
+        if start > n:
+            start, row = max(
+                ((index, cached) for index, cached in self._rows.items() if index <= n),
+                default=(0, array('q', [1])),
+                key=lambda item: item[0],
+            )
+        for _ in range(start + 1, n + 1):
+            row = self._compact([1, *map(int.__add__, row, row[1:]), 1])
+        if n >= self._frontier[0]:
+            self._frontier = (n, row)
+
+        self._rows[n] = row
+        if len(self._rows) > self.row_limit:
+            self._rows.popitem(last=False)
+        return row
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @staticmethod
+    def _compact(row: list[int]) -> Sequence[int]:
+        if row[len(row) // 2] <= INT64_MAX:
+            return array('q', row)
+        return tuple(row)
+
+
+pascal_triangle = PascalTriangle()
 
 
 def binom(n: int, k: int) -> int:
-    return int(frac_binom(n, k))
+    if k < 0 or k > n:
+        return 0
+    return pascal_triangle.row(n)[k]
 
 
 def generate_nonnegative_integer() -> int:
@@ -50,15 +93,57 @@ def property_test_pascal_identity(nk: tuple[int, int]) -> None:
     assert binom(n, k) == binom(n - 1, k - 1) + binom(n - 1, k)
 
 
+def backward_coefficients(length: int) -> tuple[int, ...]:
+    row = pascal_triangle.row(length)
+    return tuple(
+        row[j + 1] if j % 2 == 0 else -row[j + 1]
+        for j in range(length)
+    )
+
+
+def forward_coefficients(length: int) -> tuple[int, ...]:
+    return backward_coefficients(length)[::-1]
+
+
+def extrapolate_backward(row: list[int]) -> int:
+    return sum(map(int.__mul__, backward_coefficients(len(row)), row))
+
+
+def extrapolate_forward(row: list[int]) -> int:
+    return sum(map(int.__mul__, forward_coefficients(len(row)), row))
+
+
 def extrapolate(row: list[int]) -> int:
-    summands = [
-        ((-1) ** i) * sum(
-            ((-1) ** (j)) * binom(i, j) * row[i - j]
-            for j in range(i + 1)
-        )
-        for i in range(len(row))
-    ]
-    return sum(summands)
+    return extrapolate_backward(row)
+
+
+def extrapolate_matrix(rows: list[list[int]]) -> tuple[list[int], list[int]]:
+    backward = backward_coefficients(len(rows[0]))
+    largest_value = max((abs(value) for row in rows for value in row), default=0)
+    largest_coefficient = max(map(abs, backward), default=0)
+    fits_int64 = largest_coefficient <= INT64_MAX and largest_value * sum(map(abs, backward)) <= INT64_MAX
+    dtype = np.int64 if fits_int64 else object
+    matrix = np.array(rows, dtype=dtype).reshape(len(rows), len(backward))
+    coefficients = np.array(backward, dtype=dtype)
+    return (matrix @ coefficients).tolist(), (matrix @ coefficients[::-1]).tolist()
+
+
+def extrapolate_all(rows: list[list[int]]) -> tuple[int, int]:
+    rows_by_length: defaultdict[int, list[list[int]]] = defaultdict(list)
+    for row in rows:
+        rows_by_length[len(row)].append(row)
+    previous_total, next_total = 0, 0
+    for same_length_rows in rows_by_length.values():
+        previous_values, next_values = extrapolate_matrix(same_length_rows)
+        previous_total += sum(previous_values)
+        next_total += sum(next_values)
+    return previous_total, next_total
+
+
+def extrapolate_by_differences(row: list[int]) -> int:
+    if not any(row):
+        return 0
+    return row[-1] + extrapolate_by_differences([b - a for a, b in zip(row, row[1:])])
 
 
 def main_parsed(rows: list[list[int]]) -> int:
@@ -83,7 +168,54 @@ def main(to_parse: str) -> int:
 
 assert main(example_data) == 2
 
+assert backward_coefficients(3) == (3, -3, 1)
+assert forward_coefficients(3) == (1, -3, 3)
+assert extrapolate_forward([0, 3, 6, 9, 12, 15]) == 18
+assert extrapolate_forward([10, 13, 16, 21, 30, 45]) == 68
+assert extrapolate_backward([10, 13, 16, 21, 30, 45]) == 5
+assert extrapolate_forward([]) == extrapolate_backward([]) == 0
+assert extrapolate_forward([7]) == extrapolate_backward([7]) == 7
+long_row = [3 * i ** 7 - i ** 4 + 11 for i in range(300)]
+assert extrapolate_forward(long_row) == extrapolate_by_differences(long_row) == 3 * 300 ** 7 - 300 ** 4 + 11
+assert extrapolate_backward(long_row) == extrapolate_by_differences(long_row[::-1]) == 3 * (-1) ** 7 - 1 + 11
+small_triangle = PascalTriangle(row_limit=3)
+assert list(small_triangle.row(4)) == [1, 4, 6, 4, 1]
+assert list(small_triangle.row(0)) == [1]
+assert list(small_triangle.row(2)) == [1, 2, 1]
+assert list(small_triangle.row(5)) == [1, 5, 10, 10, 5, 1]
+assert list(small_triangle.row(3)) == [1, 3, 3, 1]
+assert len(small_triangle) == 3
+assert isinstance(small_triangle.row(66), array)
+assert isinstance(small_triangle.row(67), tuple)
+assert all(small_triangle.row(n)[k] == comb(n, k) for n in [400, 7, 150, 1] for k in range(n + 1))
+assert len(small_triangle) == 3
+assert binom(5, 6) == binom(5, -1) == 0
+assert len(pascal_triangle) <= pascal_triangle.row_limit
+
+example_rows = [integers(line).result for line in example_data.split('\n')]
+assert extrapolate_matrix(example_rows) == ([-3, 0, 5], [18, 28, 68])
+assert extrapolate_all(example_rows + [[1, 2], [5]]) == (2 + 0 + 5, 114 + 3 + 5)
+assert extrapolate_all([]) == (0, 0)
+assert extrapolate_matrix([[], []]) == ([0, 0], [0, 0])
+assert extrapolate_matrix([long_row, long_row[::-1]]) == (
+    [extrapolate_backward(long_row), extrapolate_forward(long_row)],
+    [extrapolate_forward(long_row), extrapolate_backward(long_row)],
+)
+assert extrapolate_matrix([[2 ** 62, 2 ** 62 + 1]]) == ([2 ** 62 - 1], [2 ** 62 + 2])
+assert extrapolate_matrix([[0] * 67, [0] * 67]) == ([0, 0], [0, 0])
+assert extrapolate_matrix([[0] * 200]) == ([0], [0])
+
 with open('day9_input') as f:
     to_parse = f.read()
 
 print(main(to_parse))
+print(sum(extrapolate_forward(integers(line).result) for line in to_parse.split('\n')))
+
+rows = [integers(line).result for line in to_parse.split('\n')]
+start = perf_counter()
+print(extrapolate_all(rows))
+print(perf_counter() - start)
+if __name__ == '__main__':
+    start = perf_counter()
+    extrapolate_all(1000 * rows)
+    print(perf_counter() - start)
@@ -1,23 +1,28 @@
 from __future__ import annotations
 
 from enum import Enum
-from typing import TypeVar, Generic, Callable, Hashable, Optional, Iterator
-from uuid import uuid4
+from itertools import count
+from time import perf_counter
+from typing import TypeVar, Generic, Callable, Hashable, Iterator
 
 T = TypeVar('T')
 
 
 class Node(Generic[T]):
-    def __init__(self, payload: T, id_: Optional[Hashable] = None) -> None:
+    __slots__ = ('payload', 'id', 'traversal_state')
+
+    def __init__(self, payload: T, id_: Hashable) -> None:
         self.payload = payload
-        self.id = id_ or uuid4()
+        self.id = id_
         self.traversal_state = TraversalState.UNDISCOVERED
 
     def __hash__(self) -> int:
         return hash(self.id)
 
-    def __eq__(self, other: Node[T]) -> bool:
-        return hash(self) == hash(other)
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Node):
+            return NotImplemented
+        return self.id == other.id
 
     def __repr__(self) -> str:
         return repr(self.id)
@@ -34,6 +39,16 @@ class Graph(Generic[T]):
     def __init__(self, nodes: set[Node[T]]) -> None:
         self._nodes: dict[NodeId, Node[T]] = {node.id: node for node in nodes}
         self._edges: dict[NodeId, set[Node[T]]] = {node.id: set() for node in nodes}
+        self._ids = count()
+
+    def add_node(self, payload: T) -> Node[T]:
+        id_ = next(self._ids)
+        while id_ in self._nodes:
+            id_ = next(self._ids)
+        node = Node(payload=payload, id_=id_)
+        self._nodes[node.id] = node
+        self._edges[node.id] = set()
+        return node
 
     def insert_edge(
         self,
@@ -67,19 +82,32 @@ def graph_from_grid(
     grid: list[list[bool]],
     payload_factory: Callable[[], T]
 ) -> Graph[T]:
+    graph = Graph(set())
     nodes = dict()
     for y, row in enumerate(grid):
         for x, element in enumerate(row):
             if not element:
                 continue
-            node = Node(payload=payload_factory())
-            nodes[(x, y)] = node
-    graph = Graph(set(nodes.values()))
+            nodes[(x, y)] = graph.add_node(payload_factory())
     for coordinates, node in nodes.items():
         x, y = coordinates
         for neighbor in {(x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)}:
             if neighbor not in nodes:
                 continue
-            graph.insert_edge(node, nodes[neighbor])
+            graph.insert_edge(node.id, nodes[neighbor].id)
 
     return graph
+
+
+assert Node(None, 1) == Node('other payload', 1)
+assert Node(None, 1) != Node(None, 2)
+assert Node(None, 1) != 1
+assert [node.id for node in graph_from_grid([[True, False, True]], lambda: None)._nodes.values()] == [0, 1]
+assert graph_from_grid([[True, True]], lambda: None).has_edge(0, 1)
+assert not graph_from_grid([[True, False, True]], lambda: None).has_edge(0, 1)
+
+
+if __name__ == '__main__':
+    start = perf_counter()
+    graph_from_grid([300 * [True] for _ in range(300)], lambda: None)
+    print(perf_counter() - start)
@@ -36,7 +36,7 @@ def or_(*parsers: Parser[T]) -> Parser[T]:
     def parser(to_parse: str) -> ParseResult[T]:
         for parser in parsers:
             attempt = parser(to_parse)
-            if attempt.result == CouldNotParse():
+            if isinstance(attempt.result, CouldNotParse):
                 continue
             return attempt
         return ParseResult(CouldNotParse(), to_parse)
@@ -48,15 +48,16 @@ def many_plus(parser: Parser[T]) -> Parser[list[T]]:
 
 
 def many(parser: Parser[T]) -> Parser[list[T]]:
-    def parser_(to_parse: str) -> ParseResult[T]:
-        result = parser(to_parse)
-        if result.result == CouldNotParse():
-            return ParseResult(result=[], remainder=to_parse)
-        remaining_results = parser_(result.remainder)
-        return ParseResult(
-            result=[result.result] + remaining_results.result,
-            remainder=remaining_results.remainder,
-        )
+    def parser_(to_parse: str) -> ParseResult[list[T]]:
+        results: list[T] = []
+        while True:
+            result = parser(to_parse)
+            if isinstance(result.result, CouldNotParse):
+                return ParseResult(result=results, remainder=to_parse)
+            results.append(result.result)
+            if result.remainder == to_parse:
+                return ParseResult(result=results, remainder=to_parse)
+            to_parse = result.remainder
 
     return parser_
 
@@ -68,7 +69,7 @@ class Skipped:
 
 def skip(characters: str) -> Parser[Skipped]:
     def parser(to_parse: str) -> ParseResult[Skipped]:
-        if any(to_parse.startswith(c) for c in characters):
+        if len(to_parse) > 0 and to_parse[0] in characters:
             return ParseResult(result=Skipped(), remainder=to_parse[1:])
         return ParseResult(result=CouldNotParse(), remainder=to_parse)
     return parser
@@ -105,12 +106,12 @@ def and_(
 ) -> Parser[U]:
     def parser(to_parse: str) -> ParseResult[U]:
         result1 = left_parser(to_parse)
-        if result1.result == CouldNotParse():
+        if isinstance(result1.result, CouldNotParse):
             return ParseResult(result=CouldNotParse(), remainder=to_parse)
 
         result2 = right_parser(result1.remainder)
 
-        if result2.result == CouldNotParse():
+        if isinstance(result2.result, CouldNotParse):
             return ParseResult(result=CouldNotParse(), remainder=to_parse)
 
         return ParseResult(combiner(result1.result, result2.result), result2.remainder)
@@ -140,7 +141,7 @@ def apply(
 ) -> Parser[S]:
     def parser_(to_parse: str) -> ParseResult[S]:
         result = parser(to_parse)
-        if result.result == CouldNotParse():
+        if isinstance(result.result, CouldNotParse):
             return ParseResult(result=CouldNotParse(), remainder=to_parse)
         return ParseResult(result=function(result.result), remainder=result.remainder)
     return parser_
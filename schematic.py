@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+symbols = {'$', '%', '@', '-', '=', '/', '#', '*', '+', '&'}
+number_pattern = re.compile(r'\d+')
+symbol_pattern = re.compile('[' + re.escape(''.join(sorted(symbols))) + ']')
+gear_pattern = re.compile(r'\*')
+NO_NUMBER = -1
+
+
+@dataclass(frozen=True)
+class SchematicRow:
+    text: str
+    numbers: list[int]
+    spans: list[tuple[int, int]]
+    labels: list[int]
+    symbol_mask: int
+
+    @classmethod
+    def from_text(cls, text: str) -> SchematicRow:
+        numbers: list[int] = []
+        spans = []
+        labels = [NO_NUMBER] * len(text)
+        for match in number_pattern.finditer(text):
+            start, end = match.span()
+            labels[start:end] = [len(numbers)] * (end - start)
+            numbers.append(int(match.group()))
+            spans.append((start, end))
+        symbol_mask = 0
+        for match in symbol_pattern.finditer(text):
+            symbol_mask |= 1 << match.start()
+        return SchematicRow(text, numbers, spans, labels, symbol_mask)
+
+
+EMPTY_ROW = SchematicRow.from_text('')
+
+
+@dataclass(frozen=True)
+class Gear:
+    row: int
+    column: int
+    numbers: tuple[int, ...]
+
+    def ratio(self) -> int:
+        if len(self.numbers) != 2:
+            return 0
+        return self.numbers[0] * self.numbers[1]
+
+
+def windows(rows: Iterable[str]) -> Iterator[tuple[SchematicRow, SchematicRow, SchematicRow]]:
+    above, current = EMPTY_ROW, None
+    for text in rows:
+        below = SchematicRow.from_text(text.rstrip('\n'))
+        if current is not None:
+            yield above, current, below
+            above = current
+        current = below
+    if current is not None:
+        yield above, current, EMPTY_ROW
+
+
+def adjacency_mask(above: int, current: int, below: int) -> int:
+    mask = above | current | below
+    return mask | (mask << 1) | (mask >> 1)
+
+
+def part_numbers(rows: Iterable[str]) -> Iterator[int]:
+    for above, current, below in windows(rows):
+        adjacency = adjacency_mask(above.symbol_mask, current.symbol_mask, below.symbol_mask)
+        for number, (start, end) in zip(current.numbers, current.spans):
+            if adjacency >> start & ((1 << (end - start)) - 1):
+                yield number
+
+
+def find_gears(rows: Iterable[str]) -> Iterator[Gear]:
+    for row_number, (above, current, below) in enumerate(windows(rows)):
+        for match in gear_pattern.finditer(current.text):
+            column_number = match.start()
+            touching = []
+            for row in (above, current, below):
+                labels = row.labels[max(column_number - 1, 0):column_number + 2]
+                for label in sorted(set(labels) - {NO_NUMBER}):
+                    touching.append(row.numbers[label])
+            yield Gear(row_number, column_number, tuple(touching))
+
+
+def gear_ratios(rows: Iterable[str]) -> Iterator[int]:
+    for gear in find_gears(rows):
+        if len(gear.numbers) == 2:
+            yield gear.ratio()
+
+
+def read_rows(path: str) -> Iterator[str]:
+    with open(path) as f:
+        yield from f
+
+
+assert list(windows([])) == []
+assert [current.text for _, current, _ in windows(['a\n', 'b\n', 'c'])] == ['a', 'b', 'c']
+assert [(above.text, below.text) for above, _, below in windows(['a', 'b', 'c'])] == [('', 'b'), ('a', 'c'), ('b', '')]
+assert SchematicRow.from_text('.12*3') == SchematicRow('.12*3', [12, 3], [(1, 3), (4, 5)], [-1, 0, 0, -1, 1], 0b1000)